@@ -11,12 +11,8 @@ a shell prompt.
 from __future__ import with_statement, print_function
 
 import re
-import os
-import subprocess
-from datetime import datetime, timedelta
-from contextlib import closing
 from os import path
-from mercurial import extensions, commands, cmdutil, help
+from mercurial import extensions, cmdutil, help
 from mercurial.node import hex, short
 
 # command registration moved into `registrar` module in v4.3.
@@ -34,50 +30,157 @@ try :
 except :
     revrange = cmdutil.revrange
 
-FILTER_ARG = re.compile(r'\|.+\((.*)\)')
+MQ = b'mq'
+BOOKMARKS = b'bookmarks'
+TASKS = b'tasks'
+DOT = b'.'
+CLOSE = b'close'
+TIP = b'tip'
+DEFAULT_SEP = b' -> '
 
 def _with_groups(groups, out):
-    out_groups = [groups[0]] + [groups[-1]]
-
-    if any(out_groups) and not all(out_groups):
-        print ('Error parsing prompt string.  Mismatched braces?')
-
-    out = s(out)
-    out = out.replace('%', '%%')
-    return ("%s" + out + "%s") % (out_groups[0][:-1] if out_groups[0] else '',
-                                  out_groups[1][1:] if out_groups[1] else '')
-
-def _get_filter(name, g):
-    '''Return the filter with the given name, or None if it was not used.'''
-    matching_filters = list(filter(lambda s: s and s.startswith('|%s' % name), g))
-    if not matching_filters:
-        return None
+    start, end = groups[0], groups[-1]
+    return ((start[:-1] if start else '') + s(out) +
+            (end[1:] if end else ''))
 
+def _get_filters(g):
+    '''Return a dict mapping each filter name used in g to the filter.'''
     # Later filters will override earlier ones, for now.
-    f = matching_filters[-1]
+    return dict((f[1:f.index('(')] if '(' in f else f[1:], f)
+                for f in g if f and f.startswith('|'))
 
-    return f
+def _get_filter(name, filters):
+    '''Return the filter with the given name, or None if it was not used.'''
+    return filters.get(name)
 
 def _get_filter_arg(f):
     if not f:
         return None
 
-    args = FILTER_ARG.match(f).groups()
-    if args:
-        return args[0]
-    else:
+    i = f.find('(')
+    return f[i + 1:-1] if i >= 0 else None
+
+def _keyword_patterns(close):
+    '''Return (regex, handler name) pairs for each keyword.
+
+    ``close`` is the closing bracket, which filter arguments may not contain.
+    '''
+    return [
+        ('bookmark', 'bookmark'),
+        ('branch(\|quiet)?', 'branch'),
+        ('closed(\|quiet)?', 'closed'),
+        ('count(\|[^%s]*?)?' % close, 'count'),
+        ('node(?:'
+            '(\|short)'
+            '|(\|merge)'
+            ')*', 'node'),
+        ('patch(?:'
+            '(\|topindex)'
+            '|(\|applied)'
+            '|(\|unapplied)'
+            '|(\|count)'
+            '|(\|quiet)'
+            ')*', 'patch'),
+        ('patches(?:' +
+            '(\|join\([^%s]*?\))' % close +
+            '|(\|reverse)' +
+            '|(\|hide_applied)' +
+            '|(\|hide_unapplied)' +
+            '|(\|pre_applied\([^%s]*?\))' % close +
+            '|(\|post_applied\([^%s]*?\))' % close +
+            '|(\|pre_unapplied\([^%s]*?\))' % close +
+            '|(\|post_unapplied\([^%s]*?\))' % close +
+            ')*', 'patches'),
+        ('queue', 'queue'),
+        ('rev(\|merge)?', 'rev'),
+        ('root', 'root'),
+        ('root\|basename', 'basename'),
+        ('status(?:'
+            '(\|modified)'
+            '|(\|unknown)'
+            ')*', 'status'),
+        ('tags(?:' +
+            '(\|quiet)' +
+            '|(\|[^%s]*?)' % close +
+            ')*', 'tags'),
+        ('task', 'task'),
+        ('tip(?:'
+            '(\|node)'
+            '|(\|short)'
+            ')*', 'tip'),
+        ('update', 'update'),
+    ]
+
+def _compile_keywords(tag_start, tag_end, brackets):
+    '''Compile one regex matching any keyword in the given bracket style.
+
+    Each keyword's alternative is wrapped in a named group, so a match can be
+    dispatched on its ``lastgroup``.  Returns the regex, a dict mapping those
+    group names to (handler name, first, last), where
+    ``m.groups()[first:last]`` are the groups that handler expects, and a dict
+    mapping each keyword that may be used without filters to (handler name,
+    number of groups).
+    '''
+    alternatives = []
+    keywords = {}
+    bare = {}
+    ngroups = 0
+    for i, (tag, name) in enumerate(_keyword_patterns(brackets[-1])):
+        word = re.match(r'\w+', tag).group(0)
+        if re.match('(?:%s)$' % tag, word):
+            bare[word] = (name, re.compile(tag).groups + 2)
+
+        group = 'kw%d' % i
+        tag = tag_start + tag + tag_end
+        alternatives.append('(?P<%s>%s)' % (group, tag))
+        first = ngroups + 1
+        ngroups = first + re.compile(tag).groups
+        keywords[group] = (name, first, ngroups)
+    return re.compile('|'.join(alternatives)), keywords, bare
+
+def _split_flat(fs, brackets):
+    '''Split a template that has no extended-form keywords.
+
+    Returns a list alternating between literal text and the contents of each
+    bracketed token, starting and ending with text.  Returns None if fs has
+    nested or stray brackets, in which case it needs the full regex.
+    '''
+    start, end = brackets
+    parts = fs.split(start)
+    if end in parts[0]:
         return None
 
+    tokens = [parts[0]]
+    for n, part in enumerate(parts[1:]):
+        name, sep, text = part.partition(end)
+        if not sep:
+            if n < len(parts) - 2:
+                return None
+            # An unclosed bracket at the very end never matches a keyword.
+            tokens[-1] += start + part
+        elif end in text:
+            return None
+        else:
+            tokens.extend((name, text))
+    return tokens
+
+# The keyword patterns only depend on the bracket style, so compile both
+# variants once instead of on every prompt.
+KEYWORDS_BRACE = _compile_keywords(r'\{([^{}]*?\{)?',
+                                   r'(\}[^{}]*?)?\}', '{}')
+KEYWORDS_ANGLE = _compile_keywords(r'\<([^><]*?\<)?',
+                                   r'(\>[^><]*?)?>', '<>')
+
 def b(s):
-    return bytes(s.encode("utf-8"))
+    return s.encode("utf-8")
 
 def s(b):
     return b.decode("utf-8")
 
-@command(b('prompt'),
-         [(b(''), b('angle-brackets'), None, b('use angle brackets (<>) for keywords'))],
-         b('hg prompt STRING'))
-def prompt(ui, repo, fs=b(''), **opts):
+@command(b'prompt',
+         [(b'', b'angle-brackets', None, b'use angle brackets (<>) for keywords')],
+         b'hg prompt STRING')
+def prompt(ui, repo, fs=b'', **opts):
     '''get repository information for use in a shell prompt
 
     Take a string and output it for use in a shell prompt. You can use
@@ -112,12 +215,41 @@ def prompt(ui, repo, fs=b(''), **opts):
     This is used when no format string is passed on the command line.
     '''
 
-    def _basename(m):
-        return _with_groups(m.groups(), path.basename(repo.root)) if repo.root else ''
+    cache = {}
+    def _cached(fn):
+        '''Return fn(), computing it at most once per prompt.'''
+        if fn not in cache:
+            cache[fn] = fn()
+        return cache[fn]
+
+    def _parents():
+        return repo[None].parents()
 
-    def _bookmark(m):
+    def _mq():
         try:
-            book = extensions.find(b('bookmarks')).current(repo)
+            extensions.find(MQ)
+        except KeyError:
+            return None
+        return repo.mq
+
+    def _dot():
+        return repo[DOT]
+
+    def _dirstate_branch():
+        return repo.dirstate.branch()
+
+    def _repo_status():
+        return repo.status(unknown=True)
+
+    def _repo_status_known():
+        return repo.status(unknown=False)
+
+    def _basename(g):
+        return _with_groups(g, path.basename(repo.root)) if repo.root else ''
+
+    def _bookmark(g):
+        try:
+            book = extensions.find(BOOKMARKS).current(repo)
         except AttributeError:
             book = getattr(repo, '_bookmarkcurrent', None)
         except KeyError:
@@ -125,45 +257,48 @@ def prompt(ui, repo, fs=b(''), **opts):
         if book is None:
             book = getattr(repo, '_activebookmark', None)
         if book:
-            cur = repo[b('.')].node()
+            cur = _cached(_dot).node()
             if repo._bookmarks[book] == cur:
-                return _with_groups(m.groups(), book)
+                return _with_groups(g, book)
         else:
             return ''
 
-    def _branch(m):
-        g = m.groups()
+    def _branch(g):
+        filters = _get_filters(g)
 
-        branch = repo.dirstate.branch()
-        quiet = _get_filter('quiet', g)
+        branch = _cached(_dirstate_branch)
+        quiet = _get_filter('quiet', filters)
 
         out = branch if (not quiet) or (branch != 'default') else ''
 
         return _with_groups(g, out) if out else ''
 
-    def _closed(m):
-        g = m.groups()
+    def _closed(g):
+        filters = _get_filters(g)
 
-        quiet = _get_filter('quiet', g)
+        quiet = _get_filter('quiet', filters)
 
-        p = repo[None].parents()[0]
+        p = _cached(_parents)[0]
         pn = p.node()
-        branch = repo.dirstate.branch()
-        closed = (p.extra().get(b('close'))
+        branch = _cached(_dirstate_branch)
+        closed = (p.extra().get(CLOSE)
                   and pn in repo.branchheads(branch, closed=True))
-        out = b('X') if (not quiet) and closed else ''
+        out = b'X' if (not quiet) and closed else ''
 
         return _with_groups(g, out) if out else ''
 
-    def _count(m):
-        g = m.groups()
-        query = [b(g[1][1:])] if g[1] else [b('all()')]
-        return _with_groups(g, b("%d" % len(revrange(repo, query))))
+    def _count(g):
+        if g[1] is None:
+            # all() is every visible revision, which the changelog can count
+            # without evaluating a revset.
+            cl = repo.changelog
+            return _with_groups(g, b("%d" % (len(cl) - len(cl.filteredrevs))))
 
-    def _node(m):
-        g = m.groups()
+        query = [b(g[1][1:])]
+        return _with_groups(g, b("%d" % len(revrange(repo, query))))
 
-        parents = repo[None].parents()
+    def _node(g):
+        parents = _cached(_parents)
         p = 0 if '|merge' not in g else 1
         p = p if len(parents) > p else None
 
@@ -172,263 +307,227 @@ def prompt(ui, repo, fs=b(''), **opts):
         node = format(parents[p].node()) if p is not None else None
         return _with_groups(g, node) if node else ''
 
-    def _patch(m):
-        g = m.groups()
+    def _patch(g):
+        filters = _get_filters(g)
 
-        try:
-            extensions.find(b('mq'))
-        except KeyError:
+        q = _cached(_mq)
+        if q is None:
             return ''
 
-        q = repo.mq
-
-        if _get_filter('quiet', g) and not len(q.series):
+        if _get_filter('quiet', filters) and not len(q.series):
             return ''
 
-        if _get_filter('topindex', g):
+        if _get_filter('topindex', filters):
             if len(q.applied):
                 out = b('%d' % (len(q.applied) - 1))
             else:
-                out = b('')
-        elif _get_filter('applied', g):
+                out = b''
+        elif _get_filter('applied', filters):
             out = b('%d' % len(q.applied))
-        elif _get_filter('unapplied', g):
+        elif _get_filter('unapplied', filters):
             out = b('%d' % len(q.unapplied(repo)))
-        elif _get_filter('count', g):
+        elif _get_filter('count', filters):
             out = b('%d' % len(q.series))
         else:
-            out = q.applied[-1].name if q.applied else b('')
+            out = q.applied[-1].name if q.applied else b''
 
         return _with_groups(g, out) if out else ''
 
-    def _patches(m):
-        g = m.groups()
+    def _patches(g):
+        filters = _get_filters(g)
 
-        try:
-            extensions.find(b('mq'))
-        except KeyError:
+        q = _cached(_mq)
+        if q is None:
             return ''
 
-        join_filter = _get_filter('join', g)
+        join_filter = _get_filter('join', filters)
         join_filter_arg = _get_filter_arg(join_filter)
-        sep = b(join_filter_arg) if join_filter else b(' -> ')
+        sep = b(join_filter_arg) if join_filter else DEFAULT_SEP
 
-        patches = repo.mq.series
-        applied = [p.name for p in repo.mq.applied]
-        unapplied = list(filter(lambda p: p not in applied, patches))
+        patches = q.series
+        # Every patch in the series is either applied or unapplied, so one
+        # set is enough to tell them apart.
+        applied = set(p.name for p in q.applied)
 
-        if _get_filter('hide_applied', g):
-            patches = list(filter(lambda p: p not in applied, patches))
-        if _get_filter('hide_unapplied', g):
-            patches = list(filter(lambda p: p not in unapplied, patches))
+        if _get_filter('hide_applied', filters):
+            patches = [p for p in patches if p not in applied]
+        if _get_filter('hide_unapplied', filters):
+            patches = [p for p in patches if p in applied]
 
-        if _get_filter('reverse', g):
+        if _get_filter('reverse', filters):
             patches = list(reversed(patches))
 
-        pre_applied_filter = _get_filter('pre_applied', g)
-        pre_applied_filter_arg = _get_filter_arg(pre_applied_filter)
-        post_applied_filter = _get_filter('post_applied', g)
-        post_applied_filter_arg = _get_filter_arg(post_applied_filter)
+        def _arg(name):
+            return b(_get_filter_arg(_get_filter(name, filters)) or '')
 
-        pre_unapplied_filter = _get_filter('pre_unapplied', g)
-        pre_unapplied_filter_arg = _get_filter_arg(pre_unapplied_filter)
-        post_unapplied_filter = _get_filter('post_unapplied', g)
-        post_unapplied_filter_arg = _get_filter_arg(post_unapplied_filter)
+        pre_applied = _arg('pre_applied')
+        post_applied = _arg('post_applied')
+        pre_unapplied = _arg('pre_unapplied')
+        post_unapplied = _arg('post_unapplied')
 
-        if pre_applied_filter_arg:
-            pre_applied_filter_arg = b(pre_applied_filter_arg)
-
-        if post_applied_filter_arg:
-            post_applied_filter_arg = b(post_applied_filter_arg)
-
-        if pre_unapplied_filter_arg:
-            pre_unapplied_filter_arg = b(pre_unapplied_filter_arg)
-
-        if post_unapplied_filter_arg:
-            post_unapplied_filter_arg = b(post_unapplied_filter_arg)
-
-        for n, patch in enumerate(patches):
-            if patch in applied:
-                if pre_applied_filter:
-                    patches[n] = pre_applied_filter_arg + patches[n]
-                if post_applied_filter:
-                    patches[n] = patches[n] + post_applied_filter_arg
-            elif patch in unapplied:
-                if pre_unapplied_filter:
-                    patches[n] = pre_unapplied_filter_arg + patches[n]
-                if post_unapplied_filter:
-                    patches[n] = patches[n] + post_unapplied_filter_arg
+        # Build a new list rather than decorating the series in place.
+        patches = [b''.join((pre_applied, p, post_applied)) if p in applied
+                   else b''.join((pre_unapplied, p, post_unapplied))
+                   for p in patches]
 
         return _with_groups(g, sep.join(patches)) if patches else ''
 
-    def _queue(m):
-        g = m.groups()
-
-        try:
-            extensions.find(b('mq'))
-        except KeyError:
+    def _queue(g):
+        q = _cached(_mq)
+        if q is None:
             return ''
 
-        q = repo.mq
-
-        print(repr(out))
-        if out == b('patches') and not os.path.isdir(q.path):
-            out = b('')
-        elif out.startswith(b('patches-')):
+        out = path.basename(q.path)
+        if out == b'patches' and not path.isdir(q.path):
+            out = b''
+        elif out.startswith(b'patches-'):
             out = out[8:]
 
         return _with_groups(g, out) if out else ''
 
-    def _rev(m):
-        g = m.groups()
-
-        parents = repo[None].parents()
+    def _rev(g):
+        parents = _cached(_parents)
         parent = 0 if '|merge' not in g else 1
         parent = parent if len(parents) > parent else None
 
         rev = parents[parent].rev() if parent is not None else -1
         return _with_groups(g, b('%d' % rev)) if rev >= 0 else ''
 
-    def _root(m):
-        return _with_groups(m.groups(), repo.root) if repo.root else ''
+    def _root(g):
+        return _with_groups(g, repo.root) if repo.root else ''
 
-    def _status(m):
-        g = m.groups()
+    def _status(g):
+        want_modified = '|modified' in g or '|unknown' not in g
+        want_unknown = '|unknown' in g or '|modified' not in g
 
-        st = repo.status(unknown=True)
-        modified = any((st.modified, st.added, st.removed, st.deleted))
-        unknown = len(st.unknown) > 0
+        # Looking for unknown files means walking the whole working copy, so
+        # only do it when the template asks for them.
+        if want_unknown or _repo_status in cache:
+            st = _cached(_repo_status)
+        else:
+            st = _cached(_repo_status_known)
+
+        modified = want_modified and any((st.modified, st.added, st.removed,
+                                          st.deleted))
+        unknown = want_unknown and len(st.unknown) > 0
 
-        flag = b('')
+        flag = b''
         if '|modified' not in g and '|unknown' not in g:
-            flag = b('!') if modified else b('?') if unknown else ''
+            flag = b'!' if modified else b'?' if unknown else ''
         else:
             if '|modified' in g:
-                flag += b('!') if modified else b('')
+                flag += b'!' if modified else b''
             if '|unknown' in g:
-                flag += b('?') if unknown else b('')
+                flag += b'?' if unknown else b''
 
         return _with_groups(g, flag) if flag else ''
 
-    def _tags(m):
+    def _tags(g):
         # Show tags of p1.
         # As an alternative, we could show tags of p1 and p2.
-        g = m.groups()
+        filters = _get_filters(g)
 
-        sep = b(g[2][1:]) if g[2] else b(' ')
-        tags = repo[b('.')].tags()
+        sep = b(g[2][1:]) if g[2] else b' '
+        tags = _cached(_dot).tags()
 
-        quiet = _get_filter('quiet', g)
+        quiet = _get_filter('quiet', filters)
         if quiet:
-            tags = filter(lambda tag: tag != b('tip'), tags)
+            tags = [t for t in tags if t != TIP]
 
         return _with_groups(g, sep.join(tags)) if tags else ''
 
-    def _task(m):
+    def _task(g):
         try:
-            task = extensions.find(b('tasks')).current(repo)
-            return _with_groups(m.groups(), task) if task else ''
+            task = extensions.find(TASKS).current(repo)
+            return _with_groups(g, task) if task else ''
         except KeyError:
             return ''
 
-    def _tip(m):
-        g = m.groups()
-
+    def _tip(g):
         format = short if '|short' in g else hex
 
-        tip = repo[len(repo) - 1]
-        rev = tip.rev()
-        tip = format(tip.node()) if '|node' in g else b('%d' % tip.rev())
+        cl = repo.changelog
+        rev = cl.tiprev()
+        if rev < 0:
+            return ''
+
+        tip = format(cl.node(rev)) if '|node' in g else b('%d' % rev)
 
-        return _with_groups(g, tip) if rev >= 0 else ''
+        return _with_groups(g, tip)
 
-    def _update(m):
-        current_rev = repo[None].parents()[0]
+    def _update(g):
+        current_rev = _cached(_parents)[0]
 
-        # Get the tip of the branch for the current branch
+        # Get the tip of the branch for the current branch: its newest open
+        # head, or its newest head if every head is closed.
         try:
-            heads = repo.branchmap()[current_rev.branch()]
-            tip = heads[-1]
-        except (KeyError, IndexError):
+            tip = repo.branchmap().branchtip(current_rev.branch())
+        except KeyError:
             # We are in an empty repository.
-
             return ''
 
-        for head in reversed(heads):
-            if not repo[head].closesbranch():
-                tip = head
-                break
+        return _with_groups(g, b'^') if tip != current_rev.node() else ''
 
-        return _with_groups(m.groups(), b('^')) if repo[tip].node() != current_rev.node() else ''
+    handlers = {
+        'basename': _basename,
+        'bookmark': _bookmark,
+        'branch': _branch,
+        'closed': _closed,
+        'count': _count,
+        'node': _node,
+        'patch': _patch,
+        'patches': _patches,
+        'queue': _queue,
+        'rev': _rev,
+        'root': _root,
+        'status': _status,
+        'tags': _tags,
+        'task': _task,
+        'tip': _tip,
+        'update': _update,
+    }
 
     if opts.get("angle_brackets"):
-        tag_start = r'\<([^><]*?\<)?'
-        tag_end = r'(\>[^><]*?)?>'
+        pattern, keywords, bare = KEYWORDS_ANGLE
         brackets = '<>'
     else:
-        tag_start = r'\{([^{}]*?\{)?'
-        tag_end = r'(\}[^{}]*?)?\}'
+        pattern, keywords, bare = KEYWORDS_BRACE
         brackets = '{}'
 
-    patterns = {
-        'bookmark': _bookmark,
-        'branch(\|quiet)?': _branch,
-        'closed(\|quiet)?': _closed,
-        'count(\|[^%s]*?)?' % brackets[-1]: _count,
-        'node(?:'
-            '(\|short)'
-            '|(\|merge)'
-            ')*': _node,
-        'patch(?:'
-            '(\|topindex)'
-            '|(\|applied)'
-            '|(\|unapplied)'
-            '|(\|count)'
-            '|(\|quiet)'
-            ')*': _patch,
-        'patches(?:' +
-            '(\|join\([^%s]*?\))' % brackets[-1] +
-            '|(\|reverse)' +
-            '|(\|hide_applied)' +
-            '|(\|hide_unapplied)' +
-            '|(\|pre_applied\([^%s]*?\))' % brackets[-1] +
-            '|(\|post_applied\([^%s]*?\))' % brackets[-1] +
-            '|(\|pre_unapplied\([^%s]*?\))' % brackets[-1] +
-            '|(\|post_unapplied\([^%s]*?\))' % brackets[-1] +
-            ')*': _patches,
-        'queue': _queue,
-        'rev(\|merge)?': _rev,
-        'root': _root,
-        'root\|basename': _basename,
-        'status(?:'
-            '(\|modified)'
-            '|(\|unknown)'
-            ')*': _status,
-        'tags(?:' +
-            '(\|quiet)' +
-            '|(\|[^%s]*?)' % brackets[-1] +
-            ')*': _tags,
-        'task': _task,
-        'tip(?:'
-            '(\|node)'
-            '|(\|short)'
-            ')*': _tip,
-        'update': _update
-    }
+    def _dispatch(m):
+        name, first, last = keywords[m.lastgroup]
+        g = m.groups()[first:last]
+        if any((g[0], g[-1])) and not all((g[0], g[-1])):
+            ui.warn(b'Error parsing prompt string.  Mismatched braces?\n')
+        return handlers[name](g)
+
+    def _expand(name):
+        if name in bare:
+            handler, ngroups = bare[name]
+            return handlers[handler]((None,) * ngroups) or ''
+
+        tag = brackets[0] + name + brackets[-1]
+        m = pattern.match(tag)
+        return (_dispatch(m) or '') if m else tag
 
     if not fs:
         fs = repo.ui.config(b"prompt", b"template", b"")
 
     fs = s(fs)
-    for tag, repl in patterns.items():
-        fs = re.sub(tag_start + tag + tag_end, repl, fs)
+    tokens = _split_flat(fs, brackets)
+    if tokens is None:
+        fs = pattern.sub(_dispatch, fs)
+    else:
+        # Without nesting every keyword is a whole token, so most of them can
+        # be looked up directly instead of going through the regex.
+        for n in range(1, len(tokens), 2):
+            tokens[n] = _expand(tokens[n])
+        fs = ''.join(tokens)
     fs = b(fs)
 
     ui.status(fs)
 
-help.helptable += (
-    ([b('prompt-keywords')], b('Keywords supported by hg-prompt'),
-     lambda _: b('''hg-prompt currently supports a number of keywords.
+KEYWORDS_HELP = b'''hg-prompt currently supports a number of keywords.
 
 Some keywords support filters.  Filters can be chained when it makes
 sense to do so.  When in doubt, try it!
@@ -579,5 +678,12 @@ update
      Display `^` if the current parent is not the tip of the current branch,
      otherwise nothing.  In effect, this lets you see if running `hg update`
      would do something.
-''')),
-)
+'''
+
+def extsetup(ui):
+    # Only register the help topic once Mercurial actually sets up the
+    # extension, rather than as a side effect of importing the module.
+    help.helptable += (
+        ([b'prompt-keywords'], b'Keywords supported by hg-prompt',
+         lambda _: KEYWORDS_HELP),
+    )
@@ -0,0 +1,43 @@
+'''Test output of {count}.'''
+
+from nose import *
+from util import *
+
+
+@with_setup(setup_sandbox, teardown_sandbox)
+def test_empty_repo():
+    output = prompt(fs='{count}')
+    assert output == '0'
+
+    output = prompt(fs='{ there are {count} revisions}')
+    assert output == ' there are 0 revisions'
+
+
+@with_setup(setup_sandbox, teardown_sandbox)
+def test_count():
+    hg_commit()
+
+    output = prompt(fs='{count}')
+    assert output == '1'
+
+    hg_commit()
+    hg_commit()
+
+    output = prompt(fs='{count}')
+    assert output == '3'
+
+    output = prompt(fs='{ there are {count} revisions}')
+    assert output == ' there are 3 revisions'
+
+
+@with_setup(setup_sandbox, teardown_sandbox)
+def test_revset():
+    hg_commit()
+    hg_commit()
+    hg_commit()
+
+    output = prompt(fs='{count|all()}')
+    assert output == '3'
+
+    output = prompt(fs='{count|1:}')
+    assert output == '2'